@@ -1,69 +1,50 @@
-import json
-from collections import defaultdict
+import string
+import sys
 from datetime import datetime
-import re
-import csv
-from utils import load_json, save_json
+import pandas as pd
+from utils import load_json
 
-def save_daily_stats_to_csv(entries_per_day, words_per_day, filename='daily_journal_stats.csv'):
+# Punctuation is dropped before splitting so that standalone dashes, quotes etc. aren't counted as words
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation + '«»—–…')
+
+def save_daily_stats_to_csv(daily_stats, filename='daily_journal_stats.csv'):
     """Save daily statistics to a CSV file."""
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        # Write header
-        writer.writerow(['Date', 'Entries', 'Words'])
-        # Write data rows
-        for date in sorted(entries_per_day.keys()):
-            writer.writerow([
-                date,
-                entries_per_day[date],
-                words_per_day[date]
-            ])
+    # One vectorized write; '\r\n' keeps the line endings csv.writer used to produce
+    daily_stats.sort_index().rename(columns={'entries': 'Entries', 'words': 'Words'}).to_csv(
+        filename, columns=['Entries', 'Words'], index_label='Date', encoding='utf-8', lineterminator='\r\n'
+    )
     print(f"\nDaily statistics have been saved to {filename}")
 
 def analyze_journals():
     # Read the journal entries
     entries = load_json('journal_entries.json')
-    
-    # Initialize counters and data structures
     total_entries = len(entries)
-    total_words = 0
-    entries_per_day = defaultdict(int)
-    words_per_day = defaultdict(int)
-    entries_per_month = defaultdict(int)
-    words_per_month = defaultdict(int)
     
-    # Process each entry
-    for entry in entries:
-        # Get the date from the entry
-        date_str = entry.get('date', '')
-        if not date_str:
-            continue
-            
-        # Clean and parse the date
+    # One row per dated entry: date (time component removed) and word count
+    df = pd.DataFrame(
+        [{
+            'date': entry['date'].split()[0],
+            'words': len(entry.get('content', '').translate(_PUNCT_TABLE).split())
+        } for entry in entries if entry.get('date')],
+        columns=['date', 'words']
+    )
+    
+    # Parse dates in one vectorized pass; cache=True parses each distinct date once
+    raw_dates = df['date']
+    df['date'] = pd.to_datetime(raw_dates, format='%Y-%m-%d', errors='coerce', cache=True)
+    invalid = df['date'].isna()
+    for date_str in raw_dates[invalid]:
+        # Re-parse the rejected dates only, to report strptime's own reason
         try:
-            # Remove any time component if present
-            date_str = date_str.split()[0]
-            date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            date_key = date.isoformat()
-            month_key = date.strftime('%Y-%m')  # Format: YYYY-MM
-            
-            # Count entries per day and month
-            entries_per_day[date_key] += 1
-            entries_per_month[month_key] += 1
-            
-            # Count words in the content
-            content = entry.get('content', '')
-            # Split on whitespace and filter out empty strings
-            words = [word for word in re.findall(r'\b\w+\b', content.lower())]
-            word_count = len(words)
-            
-            total_words += word_count
-            words_per_day[date_key] += word_count
-            words_per_month[month_key] += word_count
-            
-        except (ValueError, AttributeError) as e:
+            datetime.strptime(date_str, '%Y-%m-%d')
+        except ValueError as e:
             print(f"Error processing date {date_str}: {e}")
-            continue
+    df = df[~invalid]
+    
+    # Group by day and month
+    daily_stats = df.groupby(df['date'].dt.date).agg(entries=('words', 'size'), words=('words', 'sum'))
+    monthly_stats = df.groupby(df['date'].dt.to_period('M')).agg(entries=('words', 'size'), words=('words', 'sum'))
+    total_words = int(df['words'].sum())
     
     # Calculate and print statistics
     print("\nJournal Analysis Results:")
@@ -76,23 +57,24 @@ def analyze_journals():
     print("-" * 50)
     print(f"{'Month':<10} {'Entries':<10} {'Total Words':<15} {'Avg Words/Entry':<20}")
     print("-" * 50)
-    for month in sorted(entries_per_month.keys()):
-        entries = entries_per_month[month]
-        words = words_per_month[month]
-        avg_words = words / entries if entries > 0 else 0
-        print(f"{month:<10} {entries:<10} {words:<15} {avg_words:.2f}")
+    # Emit each table with a single write instead of one print per row
+    lines = [
+        f"{str(month):<10} {entries:<10} {words:<15} {words / entries if entries > 0 else 0:.2f}"
+        for month, entries, words in monthly_stats.itertuples()
+    ]
+    sys.stdout.write(''.join(line + '\n' for line in lines))
     
     print("\nDaily Statistics:")
     print("-" * 50)
-    for date in sorted(entries_per_day.keys()):
-        print(f"{date}: {entries_per_day[date]} entries, {words_per_day[date]} words")
+    lines = [f"{date}: {entries} entries, {words} words" for date, entries, words in daily_stats.itertuples()]
+    sys.stdout.write(''.join(line + '\n' for line in lines))
     
     # Save daily statistics to CSV
-    save_daily_stats_to_csv(entries_per_day, words_per_day)
+    save_daily_stats_to_csv(daily_stats)
     
     # Calculate some additional statistics
-    days_with_entries = len(entries_per_day)
-    months_with_entries = len(entries_per_month)
+    days_with_entries = len(daily_stats)
+    months_with_entries = len(monthly_stats)
     print(f"\nSummary Statistics:")
     print("-" * 50)
     print(f"Number of days with entries: {days_with_entries}")
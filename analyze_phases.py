@@ -1,29 +1,24 @@
-import os
-from openai import OpenAI
-from utils import get_openai_client, ensure_directory
+import re
+from pathlib import Path
+from utils import get_openai_client
+
+# A "Date: <date>" line, allowing any surrounding whitespace but newlines (as str.strip() does
+# per line); a bare "Date:" line is body text
+_DATE_HEADER_RE = re.compile(r'^[^\S\n]*Date: (.*?\S)[^\S\n]*$', re.MULTILINE)
 
 def read_phase_file(filename):
     """Read entries from a phase file and return them as a list of (date, text) tuples."""
-    entries = []
-    current_date = None
-    current_text = []
+    text = Path(filename).read_text(encoding='utf-8')
     
-    with open(filename, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith('Date: '):
-                # Save previous entry if exists
-                if current_date and current_text:
-                    entries.append((current_date, '\n'.join(current_text)))
-                # Start new entry
-                current_date = line[6:]  # Remove 'Date: ' prefix
-                current_text = []
-            elif line:  # Non-empty line that's not a date
-                current_text.append(line)
+    # Splitting on the date headers yields [preamble, date1, body1, date2, body2, ...]
+    parts = _DATE_HEADER_RE.split(text)
     
-    # Don't forget the last entry
-    if current_date and current_text:
-        entries.append((current_date, '\n'.join(current_text)))
+    entries = []
+    for date, body in zip(parts[1::2], parts[2::2]):
+        # Keep only non-empty lines, stripped
+        body = '\n'.join(line.strip() for line in body.split('\n') if line.strip())
+        if date and body:
+            entries.append((date, body))
     
     return entries
 
@@ -3,7 +3,7 @@ import pinecone
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-from utils import search_pinecone, save_json
+from functools import lru_cache
 
 load_dotenv()
 
@@ -21,13 +21,23 @@ def create_embedding(text):
     )
     return response.data[0].embedding
 
+def create_embeddings(texts):
+    """Embed several texts with a single OpenAI request."""
+    response = client.embeddings.create(
+        input=texts,
+        model="text-embedding-ada-002"
+    )
+    return [item.embedding for item in response.data]
+
+@lru_cache(maxsize=8192)
 def date_to_timestamp(date_str):
     """Convert date string (YYYY-MM-DD) to Unix timestamp."""
     dt = datetime.strptime(date_str, '%Y-%m-%d')
     return int(dt.timestamp())
 
-def search_phase(query_text, start_date, end_date, top_k=10):
-    embedding = create_embedding(query_text)
+def search_phase(query_text, start_date, end_date, top_k=10, embedding=None):
+    if embedding is None:
+        embedding = create_embedding(query_text)
     # Convert dates to timestamps for Pinecone filtering
     start_timestamp = date_to_timestamp(start_date)
     end_timestamp = date_to_timestamp(end_date)
@@ -53,8 +63,7 @@ def search_phase(query_text, start_date, end_date, top_k=10):
 def save_entries(filename, entries):
     """Save entries to a file with date and text."""
     with open(filename, 'w', encoding='utf-8') as f:
-        for date, text in entries:
-            f.write(f"Date: {date}\n{text.strip()}\n\n")
+        f.write(''.join(f"Date: {date}\n{text.strip()}\n\n" for date, text in entries))
 
 # Define search terms for different phases
 search_terms = [
@@ -70,24 +79,25 @@ search_terms = [
 ]
 
 def main():
-    # Search for each term
+    # Embed all terms in one request, then search for each term
+    embeddings = create_embeddings(search_terms)
     found_terms = {}
-    for term in search_terms:
-        result = search_pinecone(
-            query_text=term,
+    for term, embedding in zip(search_terms, embeddings):
+        found_terms[term] = search_phase(
+            term,
             start_date="2023-10-24",
             end_date="2024-07-01",
-            top_k=20
+            top_k=20,
+            embedding=embedding
         )
-        found_terms[term] = [(r['date'], r['text']) for r in result]
     
     # Save results to file
+    chunks = []
+    for term, matches in found_terms.items():
+        chunks.append(f"{term}\n")
+        chunks.extend(f"{date}: {text}\n\n" for date, text in matches)
     with open('found_terms.txt', 'w', encoding='utf-8') as f:
-        for term, matches in found_terms.items():
-            f.write(f"{term}\n")
-            for date, text in matches:
-                f.write(f"{date}: {text}\n")
-                f.write("\n")
+        f.writelines(chunks)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
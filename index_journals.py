@@ -1,50 +1,59 @@
-import json
+import orjson
 import os
 import nltk
-from nltk.tokenize import word_tokenize
 import pinecone
-from openai import OpenAI
 from datetime import datetime
 from dotenv import load_dotenv
 from tqdm import tqdm
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Deque, Tuple
 import argparse
 import tiktoken
-import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+from utils import get_embeddings_batch
 
 # Load environment variables
 load_dotenv()
 
 
-# Initialize OpenAI and Pinecone
+# Initialize OpenAI and Pinecone (embeddings go through utils' shared OpenAI client)
 api_key = os.getenv("OPENAI_API_KEY")
 if not api_key:
     raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-client = OpenAI(api_key=api_key)
-
 pc = pinecone.Pinecone(
     api_key=os.getenv("PINECONE_API_KEY"),
 )
 
-# Download required NLTK data
-nltk.download('punkt_tab', quiet=True)
-
 # Constants
 INDEX_NAME = "emotional-journals"
 DIMENSION = 1536  # Dimension for text-embedding-ada-002
 BATCH_SIZE = 10  # Reduced batch size to stay under 2MB limit
 PROGRESS_FILE = "indexing_progress.json"
+PROGRESS_SAVE_EVERY = 10  # Save progress after this many entries...
+PROGRESS_SAVE_INTERVAL = 60  # ...or after this many seconds, whichever comes first
 MAX_TOKENS = 8000  # Conservative limit for text-embedding-ada-002 (8192 max)
 MAX_REQUEST_SIZE = 1.8 * 1024 * 1024  # 1.8MB to be safe (Pinecone limit is 2MB)
+METADATA_OVERHEAD = 256  # Bytes reserved for the metadata fields other than text
+MAX_WORKERS = 8  # Entries embedded concurrently; bounded by the OpenAI rate limit
+MAX_IN_FLIGHT = 2 * MAX_WORKERS  # Entries submitted for embedding but not yet uploaded
+CHUNKING_BATCH_SIZE = 16  # Entries sent to a chunking worker process at a time
+
+# Resolve the tokenizer once; encoding_for_model is expensive to call per text
+_ENCODING = tiktoken.encoding_for_model("text-embedding-ada-002")
 
+@lru_cache(maxsize=4096)
 def count_tokens(text: str) -> int:
     """Count the number of tokens in a text using tiktoken."""
-    encoding = tiktoken.encoding_for_model("text-embedding-ada-002")
-    return len(encoding.encode(text))
+    return len(_ENCODING.encode(text))
 
-def split_into_chunks(text: str, max_tokens: int = MAX_TOKENS) -> List[str]:
-    """Split text into chunks that fit within token limit."""
+def split_into_chunks(text: str, max_tokens: int = MAX_TOKENS, sentences: Optional[List[str]] = None) -> List[str]:
+    """Split text into chunks that fit within token limit.
+    
+    Pass `sentences` to reuse an existing sentence split of `text`.
+    """
     if count_tokens(text) <= max_tokens:
         return [text]
         
@@ -53,14 +62,17 @@ def split_into_chunks(text: str, max_tokens: int = MAX_TOKENS) -> List[str]:
     current_tokens = 0
     
     # Split into sentences first
-    sentences = nltk.sent_tokenize(text, language='russian')
+    if sentences is None:
+        sentences = split_into_sentences(text)
     
     for sentence in sentences:
         sentence_tokens = count_tokens(sentence)
         
         # If a single sentence is too long, split it into words
         if sentence_tokens > max_tokens:
-            words = word_tokenize(sentence)
+            # Whitespace splitting is enough for packing words under a token budget
+            words = sentence.split()
+            # count_tokens is cached, and journal vocabulary repeats a lot
             for word in words:
                 word_tokens = count_tokens(word)
                 if current_tokens + word_tokens > max_tokens:
@@ -85,13 +97,12 @@ def split_into_chunks(text: str, max_tokens: int = MAX_TOKENS) -> List[str]:
     
     return chunks
 
-def get_embedding(text: str) -> List[float]:
-    """Get embedding for a text using OpenAI's text-embedding-ada-002 model."""
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=text
-    )
-    return response.data[0].embedding
+def ensure_nltk_data():
+    """Download the NLTK sentence tokenizer data unless it is already installed."""
+    try:
+        nltk.data.find('tokenizers/punkt_tab')
+    except LookupError:
+        nltk.download('punkt_tab', quiet=True)
 
 def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences using NLTK."""
@@ -103,10 +114,15 @@ def split_into_paragraphs(text: str) -> List[str]:
     paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
     return paragraphs
 
+@lru_cache(maxsize=8192)
+def date_to_timestamp(date_str: str) -> int:
+    """Convert date string (YYYY-MM-DD) to Unix timestamp."""
+    return int(datetime.strptime(date_str, '%Y-%m-%d').timestamp())
+
 def create_metadata(entry_date: str, granularity: str, text: str, index: int = None) -> Dict[str, Any]:
     """Create metadata for a journal entry."""
     # Convert string date to timestamp for numeric filtering
-    timestamp = int(datetime.strptime(entry_date, '%Y-%m-%d').timestamp())
+    timestamp = date_to_timestamp(entry_date)
     
     metadata = {
         "date": entry_date,  # Keep the string date for display
@@ -120,38 +136,43 @@ def create_metadata(entry_date: str, granularity: str, text: str, index: int = N
         metadata["index"] = index
     return metadata
 
-def process_journal_entry(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Process a single journal entry into different granularity levels."""
-    date = entry.get("date", "")
-    content = entry.get("emotional_content", "")
+def prepare_chunks(date: str, content: str) -> Tuple[str, List[str], List[tuple]]:
+    """Split a journal entry into the texts to embed at each granularity level.
+    
+    CPU-only (no API calls), so it can run in a worker process. Returns the date,
+    the texts and a parallel list of (granularity, id_suffix, chunk_text, index) specs.
+    """
+    # Collect every chunk first so the whole entry is embedded in one request
+    all_texts: List[str] = []
+    meta_specs: List[tuple] = []  # (granularity, id_suffix, chunk_text, index)
     
-    vectors = []
+    paragraphs = split_into_paragraphs(content)
+    
+    # Sentence-split each paragraph once, and only if the entry is too long to embed whole;
+    # whole-entry chunking reuses these splits instead of tokenizing the full content again
+    if count_tokens(content) <= MAX_TOKENS:
+        paragraph_sentences = [None] * len(paragraphs)
+    else:
+        paragraph_sentences = [split_into_sentences(para) for para in paragraphs]
+    entry_sentences = [sent for sents in paragraph_sentences if sents for sent in sents]
     
     # Process whole entry, but still need to split because might be too long
     if content.strip():
         # Split content into chunks that fit within model context window
-        chunks = split_into_chunks(content)
+        chunks = split_into_chunks(content, sentences=entry_sentences or None)
         
-        # Create vector for each chunk
         for i, chunk in enumerate(chunks):
-            vectors.append({
-                "id": f"{date}_whole_chunk_{i}",
-                "values": get_embedding(chunk),
-                "metadata": create_metadata(date, "whole_chunk", chunk, i)
-            })
+            all_texts.append(chunk)
+            meta_specs.append(("whole_chunk", f"whole_chunk_{i}", chunk, i))
     
     # Process paragraphs
-    paragraphs = split_into_paragraphs(content)
-    for i, para in enumerate(paragraphs):
+    for i, (para, sentences) in enumerate(zip(paragraphs, paragraph_sentences)):
         if para.strip():
             # Split paragraph into chunks if needed
-            chunks = split_into_chunks(para)
+            chunks = split_into_chunks(para, sentences=sentences)
             for j, chunk in enumerate(chunks):
-                vectors.append({
-                    "id": f"{date}_para_{i}_chunk_{j}",
-                    "values": get_embedding(chunk),
-                    "metadata": create_metadata(date, "paragraph_chunk", chunk, f"{i}_{j}")
-                })
+                all_texts.append(chunk)
+                meta_specs.append(("paragraph_chunk", f"para_{i}_chunk_{j}", chunk, f"{i}_{j}"))
     
     # # Process sentences
     # sentences = split_into_sentences(content)
@@ -160,59 +181,104 @@ def process_journal_entry(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
     #         # Split sentence into chunks if needed (rare but possible)
     #         chunks = split_into_chunks(sent)
     #         for j, chunk in enumerate(chunks):
-    #             vectors.append({
-    #                 "id": f"{date}_sent_{i}_chunk_{j}",
-    #                 "values": get_embedding(chunk),
-    #                 "metadata": create_metadata(date, "sentence_chunk", chunk, f"{i}_{j}")
-    #             })
+    #             all_texts.append(chunk)
+    #             meta_specs.append(("sentence_chunk", f"sent_{i}_chunk_{j}", chunk, f"{i}_{j}"))
     
-    return vectors
+    return date, all_texts, meta_specs
+
+def embed_chunks(date: str, all_texts: List[str], meta_specs: List[tuple]) -> List[Dict[str, Any]]:
+    """Embed the output of prepare_chunks and build the vectors to upsert."""
+    if not all_texts:
+        return []
+    
+    embeddings = get_embeddings_batch(all_texts)
+    
+    # Create vector for each chunk
+    return [
+        {
+            "id": f"{date}_{id_suffix}",
+            "values": embedding,
+            "metadata": create_metadata(date, granularity, chunk, index)
+        }
+        for embedding, (granularity, id_suffix, chunk, index) in zip(embeddings, meta_specs)
+    ]
+
+def process_journal_entry(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Process a single journal entry into different granularity levels."""
+    return embed_chunks(*prepare_chunks(entry.get("date", ""), entry.get("emotional_content", "")))
 
 def load_progress() -> Dict[str, Any]:
     """Load progress from file if it exists."""
     if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, 'r') as f:
-            return json.load(f)
-    return {"processed_entries": [], "last_batch": []}
+        with open(PROGRESS_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    return {"processed_entries": []}
 
-def save_progress(processed_entries: List[str], last_batch: List[Dict[str, Any]] = None):
-    """Save current progress to file."""
+def save_progress(processed_entries: List[str], last_batch: Optional[List[Dict[str, Any]]] = None):
+    """Save current progress to file.
+    
+    Only the dates of fully uploaded entries are stored; anything else is
+    re-embedded on resume, which is cheaper than serializing raw embeddings.
+    `last_batch` carries vectors from an older progress file that are not uploaded yet.
+    """
     progress = {
-        "processed_entries": processed_entries,
-        "last_batch": last_batch or []
+        "processed_entries": processed_entries
     }
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump(progress, f)
+    if last_batch:
+        progress["last_batch"] = last_batch
+    with open(PROGRESS_FILE, 'wb') as f:
+        f.write(orjson.dumps(progress))
 
 def estimate_vector_size(vector: Dict[str, Any]) -> int:
     """Estimate the size of a vector in bytes."""
-    # Rough estimation: id + values + metadata
+    # Rough estimation: id + values + metadata. Metadata is dominated by the text;
+    # unicode_escape gives about the length JSON's \uXXXX escaping produces for it,
+    # without serializing the whole metadata dict
     id_size = len(vector["id"].encode('utf-8'))
     values_size = len(vector["values"]) * 4  # float32 = 4 bytes
-    metadata_size = len(json.dumps(vector["metadata"]).encode('utf-8'))
+    metadata_size = len(vector["metadata"]["text"].encode('unicode_escape')) + METADATA_OVERHEAD
     return id_size + values_size + metadata_size
 
-def get_safe_batch(vectors: List[Dict[str, Any]], max_size: int = MAX_REQUEST_SIZE) -> List[Dict[str, Any]]:
-    """Get a batch of vectors that fits within the size limit."""
-    if not vectors:
-        return []
-        
+def get_safe_batch(vectors: Deque[Dict[str, Any]], max_size: int = MAX_REQUEST_SIZE) -> List[Dict[str, Any]]:
+    """Pop a batch of vectors that fits within the size limit off the front of the queue."""
     batch = []
     current_size = 0
     
-    for vector in vectors:
-        vector_size = estimate_vector_size(vector)
+    while vectors:
+        vector_size = estimate_vector_size(vectors[0])
         if current_size + vector_size > max_size:
             break
-        batch.append(vector)
+        batch.append(vectors.popleft())
         current_size += vector_size
     
     return batch
 
+def upload_vectors(index, vectors: Deque[Dict[str, Any]]) -> None:
+    """Upsert and drain the queued vectors, in batches that respect size limits."""
+    while vectors:
+        batch = get_safe_batch(vectors)
+        if not batch:
+            print("\nWarning: Single vector too large, skipping...")
+            vectors.popleft()  # Skip the problematic vector
+            continue
+            
+        try:
+            index.upsert(vectors=batch)
+        except Exception as e:
+            if "Request size" in str(e):
+                # If we still hit size limit, reduce batch size and retry
+                print(f"\nReducing batch size due to request size limit...")
+                vectors.extendleft(reversed(batch[1:]))  # Skip one vector and try again
+            else:
+                vectors.extendleft(reversed(batch))  # Batch was not uploaded
+                raise e
+
 def main():
     parser = argparse.ArgumentParser(description='Index emotional journals in Pinecone')
     parser.add_argument('--clear', action='store_true', help='Clear existing index and progress')
     args = parser.parse_args()
+    
+    ensure_nltk_data()
 
     # Create or get Pinecone index
     if not INDEX_NAME in [index.name for index in pc.list_indexes()]:
@@ -245,62 +311,100 @@ def main():
     
     # Load journal entries and progress
     print("Loading journal entries...")
-    with open("journal_entries.json", "r") as f:
-        journal_entries = json.load(f)
+    with open("journal_entries.json", "rb") as f:
+        journal_entries = orjson.loads(f.read())
     
     progress = load_progress()
     processed_entries = set(progress["processed_entries"])
-    all_vectors = progress["last_batch"]  # Resume with any vectors from last batch
+    # Progress files written by older versions may still carry unuploaded vectors
+    legacy_vectors = deque(progress.get("last_batch", []))
+    all_vectors = deque()
+    
+    # Skip entries with no date or no emotional content, or that are already processed
+    todo = {}
+    for entry in journal_entries:
+        date = entry.get("date")
+        if date and entry.get("emotional_content") and date not in processed_entries:
+            todo.setdefault(date, entry)
     
-    print(f"Resuming from {len(processed_entries)} processed entries")
+    print(f"Resuming from {len(processed_entries)} processed entries, {len(todo)} left to process")
     
     # Process entries in batches
     print("Processing journal entries...")
+    # Chunking is CPU-bound (tiktoken, NLTK), so it runs in worker processes. Embedding
+    # mostly waits on OpenAI, so it runs in threads, fed as prepared entries arrive.
+    # Results are consumed (and uploaded) here in the main thread as they complete.
+    chunker = ProcessPoolExecutor()
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    unsaved_entries = 0
+    last_save = time.monotonic()
+    completed = False
     try:
-        for entry in tqdm(journal_entries):
-            date = entry.get("date")
-            # skip entry if date is null or no emotional content or already processed
-            if date is None or entry.get("emotional_content") is None or date in processed_entries:
-                continue
-                
-            vectors = process_journal_entry(entry)
-            all_vectors.extend(vectors)
-            processed_entries.add(date)
-            
-            # Save progress after each entry
-            save_progress(list(processed_entries), all_vectors)
+        # Upload leftovers from an older progress file first, in case nothing is left to process
+        if legacy_vectors:
+            print(f"Uploading {len(legacy_vectors)} vectors left over from the previous run...")
+            upload_vectors(index, legacy_vectors)
+        
+        prepared = iter(chunker.map(
+            prepare_chunks,
+            list(todo),
+            [entry["emotional_content"] for entry in todo.values()],
+            chunksize=CHUNKING_BATCH_SIZE
+        ))
+        dates_by_future = {}
+        progress_bar = tqdm(total=len(todo))
+        
+        while True:
+            # Keep a bounded number of entries embedding, submitting more as chunks arrive
+            while len(dates_by_future) < MAX_IN_FLIGHT:
+                chunks = next(prepared, None)
+                if chunks is None:
+                    break
+                dates_by_future[executor.submit(embed_chunks, *chunks)] = chunks[0]
+            if not dates_by_future:
+                break
             
-            # Upload in batches that respect size limits
-            while all_vectors:
-                batch = get_safe_batch(all_vectors)
-                if not batch:
-                    print("\nWarning: Single vector too large, skipping...")
-                    all_vectors = all_vectors[1:]  # Skip the problematic vector
-                    continue
-                    
-                try:
-                    index.upsert(vectors=batch)
-                    all_vectors = all_vectors[len(batch):]  # Remove processed vectors
-                    save_progress(list(processed_entries))  # Clear last batch after successful upload
-                except Exception as e:
-                    if "Request size" in str(e):
-                        # If we still hit size limit, reduce batch size and retry
-                        print(f"\nReducing batch size due to request size limit...")
-                        all_vectors = all_vectors[1:]  # Skip one vector and try again
-                    else:
-                        raise e
+            done, _ = wait(dates_by_future, return_when=FIRST_COMPLETED)
+            for future in done:
+                # Popping the future lets its vectors be freed once uploaded
+                date = dates_by_future.pop(future)
+                all_vectors.extend(future.result())
+                
+                # Upload in batches that respect size limits
+                upload_vectors(index, all_vectors)
+                
+                # All vectors of this entry are uploaded, so it can be marked as processed
+                processed_entries.add(date)
+                unsaved_entries += 1
+                progress_bar.update(1)
+                
+                # Save progress periodically rather than after every entry
+                if unsaved_entries >= PROGRESS_SAVE_EVERY or time.monotonic() - last_save >= PROGRESS_SAVE_INTERVAL:
+                    save_progress(list(processed_entries))
+                    unsaved_entries = 0
+                    last_save = time.monotonic()
         
-        print("Indexing complete!")
-        # Only clean up progress file if we processed everything
-        if len(processed_entries) == len([e for e in journal_entries if e.get("date") and e.get("emotional_content")]):
-            if os.path.exists(PROGRESS_FILE):
-                os.remove(PROGRESS_FILE)
-                print("All entries processed, progress file cleaned up")
+        progress_bar.close()
+        completed = True
             
     except Exception as e:
         print(f"\nError occurred: {str(e)}")
-        print(f"Progress saved. You can resume from where you left off by running the script again.")
         raise e
+    finally:
+        # Always record what was uploaded, including on Ctrl-C
+        save_progress(list(processed_entries), list(legacy_vectors))
+        if not completed:
+            print(f"Progress saved. You can resume from where you left off by running the script again.")
+        # Don't keep chunking or embedding queued entries after a failure
+        chunker.shutdown(cancel_futures=True)
+        executor.shutdown(cancel_futures=True)
+    
+    print("Indexing complete!")
+    # Only clean up progress file if we processed everything (leftover vectors included)
+    if processed_entries.issuperset(todo) and not legacy_vectors:
+        if os.path.exists(PROGRESS_FILE):
+            os.remove(PROGRESS_FILE)
+            print("All entries processed, progress file cleaned up")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,276 @@
+import os
+import calendar
+from pathlib import Path
+import yaml
+import orjson
+from typing import Dict, List, Optional, Any, Tuple, Iterator
+import re
+from concurrent.futures import ProcessPoolExecutor
+from utils import save_json, load_json, JSON_OPTIONS, SECTION_HEADERS, SECTION_SUBHEADERS
+
+PARSE_CHUNKSIZE = 32  # Files handed to a worker process at a time
+CACHE_FILE = '.journal_cache.json'  # Parsed entries from the last run, keyed by path
+CACHE_VERSION = 3  # Bump whenever parsing changes, so stale cached entries are discarded
+
+# Line kinds, keyed on the first character of a stripped line
+_HEADER, _TASK, _QUOTE = 'header', 'task', 'quote'
+_LINE_KINDS = {'#': _HEADER, '-': _TASK, '>': _QUOTE}
+# Frontmatter fence, as in python-frontmatter; \s* also swallows whitespace-only lines after a fence
+_FM_BOUNDARY_RE = re.compile(r'^-{3,}\s*$', re.M)
+# Whitespace-only lines containing a tab, which YAML rejects as indentation
+_TAB_BLANK_LINE_RE = re.compile(r'^[ \t]*\t[ \t]*$', re.M)
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+def _find_date(name: str) -> Optional[str]:
+    """Return the first YYYY-MM-DD shaped substring of name, scanning from each '-' instead of using a regex"""
+    p = name.find('-', 4)
+    while p != -1:
+        i = p - 4
+        if (p + 6 <= len(name) and name[p + 3] == '-' and name[i:p].isdecimal()
+                and name[p + 1:p + 3].isdecimal() and name[p + 4:p + 6].isdecimal()):
+            return name[i:p + 6]
+        p = name.find('-', p + 1)
+    return None
+
+def _is_valid_date(date_str: str) -> bool:
+    """Check that a YYYY-MM-DD string (digits only) is a real calendar date"""
+    year, month, day = int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10])
+    if year < 1 or not 1 <= month <= 12 or day < 1:
+        return False
+    # Every month has at least 28 days; only look up the month length past that
+    return day <= 28 or day <= calendar.monthrange(year, month)[1]
+
+def _parse_frontmatter(content: str) -> Tuple[Dict[str, Any], str]:
+    """Split YAML frontmatter from markdown content, following python-frontmatter's rules"""
+    text = content.strip()
+    # Most journals have no frontmatter; skip the regex and YAML entirely for them
+    if not text.startswith('---'):
+        return {}, text
+    
+    if not _FM_BOUNDARY_RE.match(text):
+        return {}, text
+    parts = _FM_BOUNDARY_RE.split(text, 2)
+    if len(parts) < 3:
+        return {}, text
+    _, fm, body = parts
+    
+    try:
+        metadata = yaml.load(fm, Loader=_YamlLoader)
+    except yaml.scanner.ScannerError:
+        # Tab-only blank lines make YAML raise; retry without them (only here, as they are
+        # significant inside block scalars, where the first attempt already succeeds)
+        metadata = yaml.load(_TAB_BLANK_LINE_RE.sub('', fm), Loader=_YamlLoader)
+    return (metadata if isinstance(metadata, dict) else {}), body.strip()
+
+class JournalEntry:
+    def __init__(self, file_path: str, content: str, metadata: Optional[Dict[str, Any]] = None):
+        self.file_path = file_path
+        self.content = content
+        # Dates in metadata are left as date objects; orjson serializes them as ISO strings
+        self.metadata = metadata or {}
+        self.date = self._extract_date_from_path(file_path)
+        self.tasks, self.emotional_content = self._classify_lines(content)
+        
+    def _extract_date_from_path(self, file_path: str) -> Optional[str]:
+        """Extract date from file path (format: YYYY-MM-DD.md or 🧠 Emotional Journal YYYY-MM-DD.md)"""
+        filename = os.path.basename(file_path)
+        # Remove .md extension
+        name_without_ext = filename.rsplit('.', 1)[0]
+        
+        # Try to find date pattern YYYY-MM-DD in the filename
+        date_str = _find_date(name_without_ext)
+        if date_str and _is_valid_date(date_str):
+            return date_str
+        return None
+
+    def _classify_lines(self, content: str) -> Tuple[List[Dict[str, Any]], str]:
+        """Extract tasks and emotional/reflective content in a single pass over the lines"""
+        tasks = []
+        current_task = None
+        non_task_lines = []
+        
+        # Content of all sections, in order; section headers themselves are not included
+        emotional_lines = []
+        has_sections = False
+        
+        # Check if this is an emotional journal entry
+        is_emotional_journal = '🧠 Emotional Journal' in self.file_path
+        
+        # Split on '\n' only, like the original extractors; strip() below drops any '\r'
+        for raw_line in content.split('\n'):
+            line = raw_line.strip()
+            if not line:
+                continue
+            kind = _LINE_KINDS.get(line[0])
+            
+            # Check if this is a section header
+            if kind is _HEADER and line in SECTION_HEADERS:
+                has_sections = True
+                continue
+            
+            # Collect task lines ("- [<mark>] text") as tasks; they never count as emotional content
+            if kind is _TASK and line.startswith('- ['):
+                if line[4:5] != ']':
+                    continue
+                completed = line[3] in 'xX'
+                text = line[5:].lstrip()
+                
+                # Indented task under a main task is a subtask (dropped if it has no text, like main tasks)
+                if raw_line[0].isspace() and current_task is not None:
+                    if text:
+                        current_task['subtasks'].append({
+                            'task': text,
+                            'completed': completed
+                        })
+                # Otherwise start a new main task (tasks without text are dropped)
+                elif text:
+                    current_task = {
+                        'task': text,
+                        'subtasks': [],
+                        'completed': completed
+                    }
+                    tasks.append(current_task)
+                else:
+                    current_task = None
+                continue
+            
+            # Skip subheaders for emotional journals
+            if kind is _QUOTE and is_emotional_journal and line in SECTION_SUBHEADERS:
+                continue
+            
+            # Add content to current section if we're in one
+            if has_sections:
+                emotional_lines.append(line)
+            # If no sections found, collect all non-task content
+            elif not has_sections and kind is not _HEADER:
+                non_task_lines.append(line)
+        
+        # If structured content exists, return the content of its sections
+        if has_sections:
+            return tasks, '\n'.join(emotional_lines).strip()
+        
+        # If no structured content, return all non-task content
+        return tasks, '\n'.join(non_task_lines).strip()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert entry to dictionary format"""
+        return {
+            'file_path': self.file_path,
+            'date': self.date,
+            'tasks': self.tasks,
+            'emotional_content': self.emotional_content,
+            'content': self.content,
+            'metadata': self.metadata
+        }
+
+def _walk_markdown(root: str) -> Iterator[str]:
+    """Yield the paths of all .md files under root, in the same order as Path.rglob('*.md')"""
+    # rglob lists a directory's files before descending into its subdirectories, in scandir order;
+    # callers resolve duplicate dates first-wins, so the order decides which file is kept
+    subdirs = []
+    with os.scandir(root) as it:
+        for dir_entry in it:
+            if dir_entry.is_dir(follow_symlinks=False):
+                subdirs.append(dir_entry.path)
+            elif dir_entry.name.endswith('.md'):
+                yield dir_entry.path
+    for subdir in subdirs:
+        yield from _walk_markdown(subdir)
+
+def _process_one(path_str: str) -> Optional[Dict[str, Any]]:
+    """Read and parse one markdown file into an entry dict (runs in a worker process)"""
+    try:
+        # Read and parse the markdown file
+        content = Path(path_str).read_text(encoding='utf-8')
+        
+        # Try to parse frontmatter if it exists
+        try:
+            metadata, body = _parse_frontmatter(content)
+            entry = JournalEntry(path_str, body, metadata)
+        except yaml.YAMLError:
+            # If the frontmatter is invalid, just use the content
+            entry = JournalEntry(path_str, content)
+        
+        return entry.to_dict()
+        
+    except Exception as e:
+        print(f"Error processing {path_str}: {str(e)}")
+        return None
+
+class JournalProcessor:
+    def __init__(self, root_dir: str, cache_file: Optional[str] = CACHE_FILE):
+        self.root_dir = Path(root_dir)
+        self.cache_file = cache_file
+        self.entries: List[Dict[str, Any]] = []
+        
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load parsed entries from the previous run, keyed by file path"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            cache = load_json(self.cache_file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache {self.cache_file}: {str(e)}")
+            return {}
+        
+        # Entries parsed by a different version of this module may be stale
+        if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+            return {}
+        return cache['entries']
+        
+    def process_directory(self) -> None:
+        """Process all markdown files in the directory and subdirectories"""
+        cache = self._load_cache()
+        new_cache = {}
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        stale = []
+        
+        # Reuse the cached entry of any file whose mtime and size are unchanged
+        for path in _walk_markdown(str(self.root_dir)):
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                # e.g. a broken symlink or a file deleted mid-run; skipped and never cached
+                print(f"Error processing {path}: {str(e)}")
+                continue
+            cached = cache.get(path)
+            if cached and cached['mtime'] == st.st_mtime_ns and cached['size'] == st.st_size:
+                results[path] = cached['entry']
+                new_cache[path] = cached
+            else:
+                results[path] = None
+                stale.append((path, st))
+        
+        # Files are independent, so parse them in parallel across cores
+        if stale:
+            with ProcessPoolExecutor() as executor:
+                parsed = executor.map(_process_one, [path for path, _ in stale], chunksize=PARSE_CHUNKSIZE)
+                for (path, st), entry in zip(stale, parsed):
+                    results[path] = entry
+                    if entry is not None:
+                        new_cache[path] = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'entry': entry}
+        
+        self.entries = [entry for entry in results.values() if entry is not None]
+        
+        # Files that were deleted since the last run drop out of the cache here
+        if self.cache_file:
+            save_json({'version': CACHE_VERSION, 'entries': new_cache}, self.cache_file)
+    
+    def save_to_json(self, output_file: str) -> None:
+        """Save processed entries to a JSON file, serializing one entry at a time"""
+        if not self.entries:
+            save_json(self.entries, output_file)
+            return
+        
+        with open(output_file, 'wb') as f:
+            separator = b'[\n  '
+            for entry in self.entries:
+                # Raw newlines only occur between JSON tokens, so re-indenting them nests the entry in the list
+                f.write(separator)
+                f.write(orjson.dumps(entry, option=JSON_OPTIONS).replace(b'\n', b'\n  '))
+                separator = b',\n  '
+            f.write(b'\n]')
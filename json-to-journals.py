@@ -1,16 +1,41 @@
-import json
+import orjson
 import os
 from pathlib import Path
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import frontmatter
-import re
+import yaml
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
-def find_first_section_occurrence(entries: List[Dict], section_name: str) -> Optional[str]:
-    """Find the first occurrence of a section across all entries"""
-    earliest_date = None
-    earliest_datetime = None
+# libyaml's emitter when available, otherwise the pure-Python one
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+WRITE_WORKERS = 16  # Output files copied/written concurrently
+
+_SECTION_HEADERS = frozenset({
+    '## 🌀What do I feel right this moment?',
+    '## 🔍Where is it coming from?',
+    '## 🛤️Do I need to solve it? How?',
+    '## emotion dump',
+    '### Journal'
+})
+
+@lru_cache(maxsize=4096)
+def _parse_date(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD date string; cached since many entries share a date"""
+    return datetime.strptime(date_str, '%Y-%m-%d')
+
+def build_first_section_index(entries: List[Dict]) -> Dict[str, str]:
+    """Map each known section header to the date of the first entry containing it.
+    
+    The empty string maps to the earliest entry with any content, which is what
+    entries without a recognised section fall back to.
+    """
+    earliest: Dict[str, Tuple[datetime, str]] = {}
     
     for entry in entries:
         content = entry.get('content', '')
@@ -18,39 +43,38 @@ def find_first_section_occurrence(entries: List[Dict], section_name: str) -> Opt
         
         if not date or not content:
             continue
-            
-        # Look for the section in the content
-        if section_name in content:
-            try:
-                entry_date = datetime.strptime(date, '%Y-%m-%d')
-                if earliest_datetime is None or entry_date < earliest_datetime:
-                    earliest_datetime = entry_date
-                    earliest_date = date
-            except ValueError:
-                continue
+        
+        try:
+            entry_date = _parse_date(date)
+        except ValueError:
+            continue
+        
+        # Look for every section in the content, skipping the substring search
+        # when this entry can't be earlier than what was already found
+        for section_name in ['', *_SECTION_HEADERS]:
+            found = earliest.get(section_name)
+            if (found is None or entry_date < found[0]) and section_name in content:
+                earliest[section_name] = (entry_date, date)
     
-    return earliest_date
+    return {section_name: date for section_name, (_, date) in earliest.items()}
 
+@lru_cache(maxsize=4096)
 def get_section_name(content: str) -> Optional[str]:
     """Extract the first section name from content"""
-
-    section_headers = [
-        '## 🌀What do I feel right this moment?',
-        '## 🔍Where is it coming from?',
-        '## 🛤️Do I need to solve it? How?',
-        '## emotion dump',
-        '### Journal'
-    ]
-    lines = content.split('\n')
-    for line in reversed(lines):
-        line = line.strip()
-        if line.startswith('##'):
-            if line in section_headers:
-                return line
-            else:
-                return None
+    # Find the last line starting with '##' by scanning back with rfind instead of
+    # splitting the whole content into lines
+    idx = content.rfind('##')
+    while idx != -1:
+        line_start = content.rfind('\n', 0, idx) + 1
+        # Only indentation may precede '##' on its line
+        if not content[line_start:idx].strip():
+            line_end = content.find('\n', idx)
+            line = content[line_start:line_end if line_end != -1 else None].strip()
+            return line if line in _SECTION_HEADERS else None
+        idx = content.rfind('##', 0, idx + 1)
     return None
 
+@lru_cache(maxsize=4096)
 def clean_emotional_content(content: str) -> str:
     """Clean up emotional content by removing section headers and extra whitespace"""
     lines = content.split('\n')
@@ -80,17 +104,24 @@ def clean_emotional_content(content: str) -> str:
 
 def process_journals():
     # Load the processed journal entries
-    with open('journal_entries.json', 'r', encoding='utf-8') as f:
-        entries = json.load(f)
+    entries = orjson.loads(Path('journal_entries.json').read_bytes())
     
     # Create output directory for emotional journals
     output_dir = "📁06 - Emotional Journals"
     os.makedirs(output_dir, exist_ok=True)
     
+    # Find the first occurrence of every section once, instead of rescanning per entry
+    first_section_dates = build_first_section_index(entries)
+    
     # Track statistics
     created_count = 0
     skipped_count = 0
     
+    # Plan all outputs first, keyed by target path, so each path is checked once
+    # and the file I/O can then run concurrently
+    copies: Dict[str, str] = {}  # target path -> existing emotional journal
+    writes: Dict[str, Tuple[str, Optional[str], str]] = {}  # target path -> (content, section, version date)
+    
     for entry in entries:
         file_path = entry['file_path']
         emotional_content = entry['emotional_content']
@@ -112,15 +143,15 @@ def process_journals():
         # If file is already an emotional journal, copy it to target dir
         if "🧠 Emotional Journal" in os.path.basename(file_path):
             new_path = os.path.join(output_dir, os.path.basename(file_path))
-            shutil.copy2(file_path, new_path)
-            print(f"Copied existing emotional journal: {new_path}")
-            created_count += 1
+            # The copy overwrites anything planned for that path earlier
+            writes.pop(new_path, None)
+            copies[new_path] = file_path
             continue
         # Get the section name from the content
         section_name = get_section_name(content)
             
         # Find the first occurrence of this section across all entries
-        version_date = find_first_section_occurrence(entries, section_name or "")
+        version_date = first_section_dates.get(section_name or "")
         if not version_date:
             version_date = date  # Fallback to file date if no section found
         
@@ -135,32 +166,51 @@ def process_journals():
             'source_file': file_path  # Add reference to original file
         }
         
-        # Create new content with frontmatter
-        new_content = frontmatter.dumps(frontmatter.Post(cleaned_content, **metadata))
+        # Create new content with frontmatter (same layout frontmatter.dumps produces)
+        yml = yaml.dump(metadata, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True)
+        new_content = f"---\n{yml}---\n\n{cleaned_content}".rstrip()
         
         # New filename includes the prefix
         new_filename = f"🧠 Emotional Journal {date}.md"
         new_path = os.path.join(output_dir, new_filename)
         
         # Check if target file already exists
-        if os.path.exists(new_path):
+        if new_path in writes or new_path in copies or os.path.exists(new_path):
             print(f"Cannot create {new_path}: File already exists")
             skipped_count += 1
             continue
-            
-        try:
-            # Write new content
-            with open(new_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            
-            print(f"Created emotional journal: {new_path}")
-            print(f"  Section: {section_name}")
-            print(f"  Version date: {version_date}")
+        
+        writes[new_path] = (new_content, section_name, version_date)
+    
+    # Copy and write the output files concurrently
+    with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+        copy_futures = {
+            new_path: executor.submit(shutil.copy2, file_path, new_path)
+            for new_path, file_path in copies.items()
+        }
+        write_futures = {
+            new_path: executor.submit(Path(new_path).write_text, new_content, encoding='utf-8')
+            for new_path, (new_content, _, _) in writes.items()
+        }
+        
+        for new_path, future in copy_futures.items():
+            future.result()
+            print(f"Copied existing emotional journal: {new_path}")
             created_count += 1
-            
-        except Exception as e:
-            print(f"Error creating {new_path}: {str(e)}")
-            skipped_count += 1
+        
+        for new_path, future in write_futures.items():
+            _, section_name, version_date = writes[new_path]
+            try:
+                future.result()
+                
+                print(f"Created emotional journal: {new_path}")
+                print(f"  Section: {section_name}")
+                print(f"  Version date: {version_date}")
+                created_count += 1
+                
+            except Exception as e:
+                print(f"Error creating {new_path}: {str(e)}")
+                skipped_count += 1
     
     # Print summary
     print("\nProcessing Summary:")
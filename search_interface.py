@@ -1,11 +1,10 @@
-import json
 import os
-from flask import Flask, render_template, request, jsonify
+import orjson
+from flask import Flask, render_template, request
 from openai import OpenAI
 import pinecone
 from dotenv import load_dotenv
 from typing import List, Dict, Literal
-import tiktoken
 from utils import search_pinecone, ensure_directory
 
 # Load environment variables
@@ -23,6 +22,7 @@ pc = pinecone.Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 # Constants
 INDEX_NAME = "emotional-journals"
 DIMENSION = 1536  # Dimension for text-embedding-ada-002
+TEMPLATE_PATH = 'templates/search.html'
 
 app = Flask(__name__)
 
@@ -64,6 +64,10 @@ def search(query: str, granularity: Literal['whole_chunk', 'paragraph_chunk', 's
     
     return formatted_results
 
+def json_response(data, status: int = 200):
+    """Build a JSON response, encoded with orjson rather than Flask's json provider."""
+    return app.response_class(orjson.dumps(data), status=status, mimetype='application/json')
+
 @app.route('/')
 def home():
     return render_template('search.html')
@@ -75,7 +79,7 @@ def search_endpoint():
     granularity = data.get('granularity', 'paragraphs')
     
     if not query:
-        return jsonify({'error': 'Query is required'}), 400
+        return json_response({'error': 'Query is required'}, 400)
     
     # Map frontend granularity to Pinecone granularity
     granularity_map = {
@@ -85,17 +89,24 @@ def search_endpoint():
     }
     
     if granularity not in granularity_map:
-        return jsonify({'error': 'Invalid granularity'}), 400
+        return json_response({'error': 'Invalid granularity'}, 400)
     
     results = search_pinecone(query, granularity_map[granularity])
-    return jsonify({'results': results})
+    return json_response({'results': results})
 
-# Create templates directory and search.html
-ensure_directory('templates')
+def _ensure_template() -> None:
+    """Write templates/search.html if it isn't there yet (only when run as a script, never on import)."""
+    if os.path.exists(TEMPLATE_PATH):
+        return
+    
+    # Create templates directory and search.html
+    ensure_directory('templates')
+    
+    # Create the HTML template
+    with open(TEMPLATE_PATH, 'w') as f:
+        f.write(_SEARCH_TEMPLATE)
 
-# Create the HTML template
-with open('templates/search.html', 'w') as f:
-    f.write('''
+_SEARCH_TEMPLATE = '''
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -205,8 +216,9 @@ with open('templates/search.html', 'w') as f:
     </script>
 </body>
 </html>
-    ''')
+    '''
 
 if __name__ == '__main__':
+    _ensure_template()
     print("Starting web server...")
     app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
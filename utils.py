@@ -1,13 +1,17 @@
 import os
-import json
+import copy
+import orjson
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Literal
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Literal, Tuple
 from pathlib import Path
 import tiktoken
-from openai import OpenAI
 import pinecone
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 # Load environment variables
 load_dotenv()
 
@@ -16,21 +20,30 @@ INDEX_NAME = "emotional-journals"
 DIMENSION = 1536  # Dimension for text-embedding-ada-002
 MAX_TOKENS = 8000  # Conservative limit for text-embedding-ada-002
 MAX_REQUEST_SIZE = 1.8 * 1024 * 1024  # 1.8MB to be safe (Pinecone limit is 2MB)
+EMBEDDING_BATCH_SIZE = 2000  # Texts per embeddings request (OpenAI accepts up to 2048)
+MAX_BATCH_TOKENS = 250_000  # Tokens per embeddings request (OpenAI allows 300k)
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS  # Pretty-printed, tolerant of date/int dict keys
 
-# Initialize OpenAI and Pinecone clients
-def get_openai_client() -> OpenAI:
+# Initialize OpenAI and Pinecone clients (once per process; the handles are reused across calls)
+@lru_cache(maxsize=1)
+def get_openai_client() -> "OpenAI":
     """Get initialized OpenAI client."""
+    # openai takes ~0.4s to import; scripts that only use the file/journal helpers never need it
+    from openai import OpenAI
+    
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is not set")
     return OpenAI(api_key=api_key)
 
+@lru_cache(maxsize=1)
 def get_pinecone_index():
     """Get initialized Pinecone index."""
     pc = pinecone.Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
     return pc.Index(INDEX_NAME)
 
 # Date handling
+@lru_cache(maxsize=8192)
 def date_to_timestamp(date_str: str) -> int:
     """Convert date string (YYYY-MM-DD) to Unix timestamp."""
     dt = datetime.strptime(date_str, '%Y-%m-%d')
@@ -41,30 +54,60 @@ def timestamp_to_date(timestamp: int) -> str:
     return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
 
 # Text processing
+@lru_cache(maxsize=None)
+def _get_encoding() -> tiktoken.Encoding:
+    """Load the tokenizer once per process, on first use (utils is imported by scripts that never count tokens)."""
+    return tiktoken.encoding_for_model("text-embedding-ada-002")
+
 def count_tokens(text: str) -> int:
     """Count the number of tokens in a text using tiktoken."""
-    encoding = tiktoken.encoding_for_model("text-embedding-ada-002")
-    return len(encoding.encode(text))
+    return len(_get_encoding().encode(text))
+
+def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
+    """Get embeddings for several texts, batching them into as few OpenAI requests as the limits allow."""
+    client = get_openai_client()
+    embeddings = []
+    batch, batch_tokens = [], 0
+    
+    def flush():
+        response = client.embeddings.create(
+            model="text-embedding-ada-002",
+            input=batch
+        )
+        embeddings.extend(item.embedding for item in response.data)
+    
+    for text in texts:
+        tokens = count_tokens(text)
+        # Start a new request once this text would exceed either per-request limit
+        if batch and (len(batch) >= EMBEDDING_BATCH_SIZE or batch_tokens + tokens > MAX_BATCH_TOKENS):
+            flush()
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    
+    if batch:
+        flush()
+    return embeddings
+
+@lru_cache(maxsize=1024)
+def _cached_embedding(text: str) -> Tuple[float, ...]:
+    """Embed one text, remembering recent results; stored as a tuple so callers can't mutate the cache."""
+    return tuple(get_embeddings_batch([text])[0])
 
 def get_embedding(text: str) -> List[float]:
     """Get embedding for a text using OpenAI's text-embedding-ada-002 model."""
-    client = get_openai_client()
-    response = client.embeddings.create(
-        model="text-embedding-ada-002",
-        input=text
-    )
-    return response.data[0].embedding
+    return list(_cached_embedding(text))
 
 # File operations
 def save_json(data: Any, filename: str) -> None:
     """Save data to a JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(data, option=JSON_OPTIONS))
 
 def load_json(filename: str) -> Any:
     """Load data from a JSON file."""
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filename, 'rb') as f:
+        return orjson.loads(f.read())
 
 def ensure_directory(directory: str) -> None:
     """Ensure a directory exists, create if it doesn't."""
@@ -79,6 +122,18 @@ def search_pinecone(
     top_k: int = 10
 ) -> List[Dict]:
     """Search Pinecone index with optional date filtering."""
+    # Repeated searches are answered from memory; results (metadata included) are deep-copied so callers can't alter the cache
+    return copy.deepcopy(list(_search_pinecone_cached(query, granularity, start_date, end_date, top_k)))
+
+@lru_cache(maxsize=256)
+def _search_pinecone_cached(
+    query: str,
+    granularity: str,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    top_k: int
+) -> Tuple[Dict, ...]:
+    """Run a Pinecone search, remembering the results of recent queries."""
     index = get_pinecone_index()
     query_embedding = get_embedding(query)
     
@@ -99,27 +154,27 @@ def search_pinecone(
     )
     
     # Format results
-    return [{
+    return tuple({
         'text': match.metadata['text'],
         'date': match.metadata['date'],
         'similarity': match.score,
         'metadata': match.metadata
-    } for match in results.matches]
+    } for match in results.matches)
 
 # Journal processing constants
-SECTION_HEADERS = [
+SECTION_HEADERS = frozenset({
     '## 🌀What do I feel right this moment?',
     '## 🔍Where is it coming from?',
     '## 🛤️Do I need to solve it? How?',
     '## emotion dump',
     '### Journal'
-]
+})
 
-SECTION_SUBHEADERS = [
+SECTION_SUBHEADERS = frozenset({
     '> Unfiltered. Go at it. Dump what you feel. It\'s for me. Deepest-darkest',
     '> Where the feeling is coming from? What\'s behind it? Don\'t overthink, just dig',
     '> Do I need to find a path forward? Is knowledge enough?',
-]
+})
 
 def is_section_header(line: str) -> bool:
     """Check if a line is a section header."""